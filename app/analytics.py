@@ -0,0 +1,307 @@
+# app/analytics.py
+"""
+Access-pattern statistics for items.
+
+Every tracked API call is recorded against its endpoint in the current time
+window with three fixed-size streaming sketches: a count-min sketch of how
+often each item_id is accessed, the top-K heavy hitters by that count, and a
+HyperLogLog of the distinct item_ids seen. Only the last few windows are
+kept, so memory is bounded however many distinct items are accessed.
+
+The hottest items are saved to a snapshot file, which the next start of the
+service reads to warm the database cache before taking traffic.
+"""
+import heapq
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+from array import array
+from collections import deque
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import request
+
+from app.config import (ACCESS_TRACKING, ACCESS_WINDOW_SECONDS, ACCESS_WINDOW_COUNT, ACCESS_TOP_K,
+                        ACCESS_STATS_PATH, ACCESS_WARM_UP_ITEMS)
+from app.models.item_queries import select_item_batch, fetch_records
+
+MASK_64 = (1 << 64) - 1
+
+
+def hash_64(key):
+    """
+    A 64-bit hash of the key, stable for the life of the process.
+    """
+    return hash(key) & MASK_64
+
+
+class CountMinSketch:
+    """
+    Approximate per-key counts in fixed memory. Estimates never undercount.
+    """
+
+    def __init__(self, width_bits=10, depth=4):
+        self.shift = 64 - width_bits
+        self.rows = [array('L', [0]) * (1 << width_bits) for _ in range(depth)]
+        # Multiply-shift hashing with a random odd multiplier per row gives each row an independent index.
+        self.multipliers = [random.getrandbits(64) | 1 for _ in range(depth)]
+
+    def _indexes(self, key):
+        h = hash_64(key)
+        return [((h * multiplier) & MASK_64) >> self.shift for multiplier in self.multipliers]
+
+    def add(self, key, count=1):
+        """
+        Counts the key and returns its new estimate.
+        """
+        estimate = None
+        for row, index in zip(self.rows, self._indexes(key)):
+            row[index] += count
+            if estimate is None or row[index] < estimate:
+                estimate = row[index]
+        return estimate
+
+    def estimate(self, key):
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+
+class TopK:
+    """
+    The k keys with the highest counts offered so far, for counts which only grow.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.counts = {}
+        # A min-heap with one (count, key) entry per tracked key. Updating a tracked key leaves its entry stale, with
+        # a lower count, and the entry is only refreshed when it reaches the top.
+        self._heap = []
+
+    def offer(self, key, count):
+        if self.k <= 0:
+            # ACCESS_TOP_K=0 tracks no keys, which leaves the heap empty.
+            return
+        if key in self.counts:
+            self.counts[key] = count
+        elif len(self.counts) < self.k:
+            self.counts[key] = count
+            heapq.heappush(self._heap, (count, key))
+        # Stale entries only ever undercount, so a key not beating the top entry can't beat the lowest tracked key.
+        elif count > self._heap[0][0]:
+            floor, lowest = self._heap[0]
+            while self.counts[lowest] != floor:
+                heapq.heapreplace(self._heap, (self.counts[lowest], lowest))
+                floor, lowest = self._heap[0]
+            if count > floor:
+                del self.counts[lowest]
+                heapq.heapreplace(self._heap, (count, key))
+                self.counts[key] = count
+
+
+class HyperLogLog:
+    """
+    Approximate count of distinct keys in fixed memory, about 3% error with the default precision.
+    """
+
+    def __init__(self, precision=10):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, key):
+        h = hash_64(key)
+        index = h >> (64 - self.precision)
+        remaining = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        for index, rank in enumerate(other.registers):
+            if rank > self.registers[index]:
+                self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        # Linear counting is more accurate while many registers are still empty.
+        if estimate <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(estimate)
+
+
+class EndpointStats:
+    """
+    The sketches for one endpoint in one time window.
+    """
+
+    def __init__(self, write, top_k):
+        self.write = write
+        self.requests = 0
+        self.sketch = CountMinSketch()
+        self.top = TopK(top_k)
+        self.distinct = HyperLogLog()
+
+    def record(self, item_ids):
+        self.requests += 1
+        for item_id in item_ids:
+            self.top.offer(item_id, self.sketch.add(item_id))
+            self.distinct.add(item_id)
+
+
+class AccessStats:
+    """
+    Access statistics per endpoint over a sliding series of time windows.
+    """
+
+    def __init__(self, window_seconds=ACCESS_WINDOW_SECONDS, window_count=ACCESS_WINDOW_COUNT, top_k=ACCESS_TOP_K):
+        self.window_seconds = window_seconds
+        self.top_k = top_k
+        # Each window is a (start time, {endpoint: EndpointStats}) pair, the oldest drop off the left.
+        self._windows = deque(maxlen=window_count)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, item_ids, write):
+        """
+        Records one call to the endpoint, accessing the given item_ids.
+        """
+        now = time.time()
+        with self._lock:
+            if not self._windows or now - self._windows[-1][0] >= self.window_seconds:
+                self._windows.append((now, {}))
+            endpoints = self._windows[-1][1]
+            stats = endpoints.get(endpoint)
+            if stats is None:
+                stats = endpoints[endpoint] = EndpointStats(write, self.top_k)
+            stats.record(item_ids)
+
+    def report(self, windows=None, top=None):
+        """
+        Summarises the most recent windows (all by default), with the top items by access count.
+        """
+        top = top or self.top_k
+        with self._lock:
+            recent = list(self._windows)[-windows:] if windows else list(self._windows)
+            by_endpoint = {}
+            for _, endpoints in recent:
+                for endpoint, stats in endpoints.items():
+                    by_endpoint.setdefault(endpoint, []).append(stats)
+
+            result = {"window_seconds": self.window_seconds, "windows": len(recent), "endpoints": {}}
+            totals = {}
+            distinct = HyperLogLog()
+            reads = writes = 0
+            for endpoint, stats_list in sorted(by_endpoint.items()):
+                counts = _top_counts(stats_list)
+                endpoint_distinct = HyperLogLog()
+                for stats in stats_list:
+                    endpoint_distinct.merge(stats.distinct)
+                requests = sum(stats.requests for stats in stats_list)
+                if stats_list[0].write:
+                    writes += requests
+                else:
+                    reads += requests
+                for item_id, count in counts.items():
+                    totals[item_id] = totals.get(item_id, 0) + count
+                distinct.merge(endpoint_distinct)
+                result["endpoints"][endpoint] = {
+                    "requests": requests,
+                    "distinct_items": endpoint_distinct.count(),
+                    "top_items": _ranked(counts, top)
+                }
+
+        result.update({
+            "since": datetime.fromtimestamp(recent[0][0], timezone.utc).isoformat() if recent else None,
+            "reads": reads,
+            "writes": writes,
+            "read_write_ratio": reads / writes if writes else None,
+            "distinct_items": distinct.count(),
+            "top_items": _ranked(totals, top)
+        })
+        return result
+
+    def save(self, path=ACCESS_STATS_PATH):
+        """
+        Writes the hottest items to the snapshot file, if any have been recorded.
+        """
+        hot_items = self.report()["top_items"]
+        if not hot_items:
+            return
+        # A temporary file of its own, so processes saving to the same path never write into each other's file.
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(os.path.abspath(path)), delete=False) as snapshot:
+            try:
+                json.dump({"saved_on": datetime.now(timezone.utc).isoformat(), "top_items": hot_items}, snapshot)
+            except BaseException:
+                snapshot.close()
+                os.unlink(snapshot.name)
+                raise
+        os.replace(snapshot.name, path)
+
+    def save_forever(self, app, path=ACCESS_STATS_PATH):
+        """
+        Saves the snapshot once per window, logging and carrying on when a save fails.
+        """
+        while True:
+            time.sleep(self.window_seconds)
+            try:
+                self.save(path)
+            except Exception:
+                app.logger.exception('Saving the access statistics failed')
+
+
+def _top_counts(stats_list):
+    """
+    Sums the counts across windows of every item in the top-K of any of them.
+    """
+    candidates = set()
+    for stats in stats_list:
+        candidates.update(stats.top.counts)
+    return {item_id: sum(stats.sketch.estimate(item_id) for stats in stats_list) for item_id in candidates}
+
+
+def _ranked(counts, top):
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"item_id": item_id, "count": count} for item_id, count in ranked]
+
+
+access_stats = AccessStats()
+
+
+def track_access(fn):
+    """
+    Resource method decorator which records the call, and the item_ids it accesses, in the access statistics.
+    """
+    if not ACCESS_TRACKING:
+        return fn
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        item_id = kwargs.get('item_id')
+        item_ids = [item_id] if item_id else request.args.getlist('item_id')
+        access_stats.record('{} {}'.format(request.method, request.url_rule.rule), item_ids,
+                            write=request.method != 'GET')
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def warm_up(app, path=ACCESS_STATS_PATH, limit=ACCESS_WARM_UP_ITEMS):
+    """
+    Reads the hottest items from the last snapshot, pulling them into the database cache. Must be called in an
+    app context. Returns how many items were read.
+    """
+    try:
+        with open(path) as snapshot:
+            item_ids = [item["item_id"] for item in json.load(snapshot)["top_items"][:limit]]
+    except (OSError, ValueError, KeyError) as e:
+        app.logger.info('No access statistics to warm up from: %s', e)
+        return 0
+    warmed = 0
+    for start in range(0, len(item_ids), 500):
+        warmed += len(fetch_records(select_item_batch, {"item_ids": item_ids[start:start + 500]}))
+    app.logger.info('Warmed up %d hot items', warmed)
+    return warmed
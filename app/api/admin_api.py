@@ -0,0 +1,79 @@
+# app/api/admin_api.py
+from flask import Response, request
+from flask_restful import Resource, abort
+from app.analytics import access_stats
+from app.api.auth import admin_required
+from app.coalescer import write_coalescer
+from app.models.item_queries import statement_cache
+from app.profiling import ProfilerBusy, request_profiles, sampling_profiler
+
+# The longest sampling profile that can be requested, in seconds.
+MAX_PROFILE_SECONDS = 60
+
+
+class SamplingProfileAPI(Resource):
+    method_decorators = [admin_required]
+
+    def get(self):
+        """
+        Samples all threads of the service for the requested number of seconds and returns the collapsed stacks.
+        """
+        seconds = min(max(request.args.get('seconds', 10, type=float), 0.1), MAX_PROFILE_SECONDS)
+        try:
+            stacks = sampling_profiler.run(seconds)
+        except ProfilerBusy as e:
+            abort(409, message=str(e))
+        # Collapsed stacks are plain text, ready for flamegraph.pl or speedscope.
+        return Response(stacks, mimetype='text/plain')
+
+
+class RequestProfileAPI(Resource):
+    method_decorators = [admin_required]
+
+    def get(self, profile_id):
+        """
+        Retrieves the profile of a single request made with the X-Profile header.
+        """
+        profile = request_profiles.get(profile_id)
+        if profile is None:
+            abort(404, message='No profile {} is stored.'.format(profile_id))
+        return {"status": "success", "result": profile}
+
+
+class StatementCacheAPI(Resource):
+    method_decorators = [admin_required]
+
+    def get(self):
+        """
+        Retrieves the size and hit rate of the compiled statement cache.
+        """
+        return {"status": "success", "result": statement_cache.stats()}
+
+
+class WriteCoalescingAPI(Resource):
+    method_decorators = [admin_required]
+
+    def get(self):
+        """
+        Retrieves the write coalescing counters.
+        """
+        return {"status": "success", "result": write_coalescer.metrics()}
+
+    def delete(self):
+        """
+        Resets the write coalescing counters.
+        """
+        write_coalescer.reset_metrics()
+        return {"status": "success", "result": write_coalescer.metrics()}
+
+
+class AccessStatsAPI(Resource):
+    method_decorators = [admin_required]
+
+    def get(self):
+        """
+        Retrieves the hottest items, distinct item counts and read/write ratio, overall and per endpoint.
+        """
+        windows = max(request.args.get('windows', 0, type=int), 0)
+        top = max(request.args.get('top', 0, type=int), 0)
+        return {"status": "success", "result": access_stats.report(windows=windows or None, top=top or None)}
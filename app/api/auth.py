@@ -0,0 +1,31 @@
+# app/api/auth.py
+import hmac
+from functools import wraps
+
+from flask import request
+from flask_restful import abort
+
+from app.config import ADMIN_TOKEN
+
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+
+
+def check_admin():
+    """
+    Aborts the request unless it carries the admin token.
+    """
+    if not ADMIN_TOKEN:
+        abort(404)
+    if not hmac.compare_digest(request.headers.get(ADMIN_TOKEN_HEADER, ''), ADMIN_TOKEN):
+        abort(403, message='A valid admin token is required.')
+
+
+def admin_required(fn):
+    """
+    Resource method decorator which only lets requests carrying the admin token through.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        check_admin()
+        return fn(*args, **kwargs)
+    return wrapper
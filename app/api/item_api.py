@@ -1,73 +1,123 @@
 # app/api/item_api.py
-from flask import jsonify, request
+from itertools import islice
+
+from flask import request
 from flask_restful import Resource
 from app import db
+from app.analytics import track_access
+from app.api.serialization import columnar, read_body, render, render_stream, wants_columnar
+from app.coalescer import write_coalescer
 from app.models.item_model import Item
+from app.models.item_queries import (select_item, update_item, delete_item, select_item_page,
+                                     select_item_batch, item_fields, execute, fetch_records,
+                                     stream_records, row_to_dict)
+from app.profiling import is_profiling, profile_request
+
+# Page size used by the item list when none is requested, and the largest page allowed.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+# How many items the export reads per round trip, and puts in each batch of the columnar layout.
+EXPORT_BATCH_SIZE = 1000
 
 
 class ItemAPI(Resource):
+    method_decorators = [track_access, profile_request]
+
     def get(self, item_id):
         """
         Retrieves an item.
         """
-        # Queries the Item table and filter by item_id provided from the API.
-        query_item = Item.query.filter(Item.item_id == item_id).first()
+        # Runs the precompiled select for the item_id provided from the API.
+        query_item = execute(select_item, {"item_id": item_id}).first()
         # Create a dictionary structure to include it in response.
-        result = {
-            "id": query_item.id,
-            "item_id": query_item.item_id,
-            "item_name": query_item.item_name,
-            "item_description": query_item.item_description
-        }
+        result = row_to_dict(query_item)
         # Return the response with status and result.
-        return jsonify({"status": "sucesss", "result": result})
+        return render({"status": "sucesss", "result": result})
 
     def put(self, item_id):
         """
         Updates an item.
         """
-        # Receives item_name and item_description from form.
-        item_name = request.form['item_name']
-        item_description = request.form['item_description']
-        # Queries the Item table and filter by item_id provided from the API.
-        query_item = Item.query.filter(Item.item_id == item_id).first()
-        # Updates the query_item object with new value.
-        query_item.item_name = item_name
-        query_item.item_description = item_description
-        # Saving the changes to the database.
-        db.session.commit()
+        # Receives item_name and item_description from form (or MessagePack body).
+        payload = read_body(form=True)
+        item_name = payload['item_name']
+        item_description = payload['item_description']
+        # Profiled updates are not coalesced, so their SQL runs on this thread and shows up in the profile.
+        if write_coalescer.enabled and not is_profiling():
+            # Queues the update to be committed with the others in its window, and waits for the commit.
+            query_item = write_coalescer.update(item_id, item_name, item_description)
+        else:
+            # Runs the precompiled update for the item_id provided from the API, returning the updated row.
+            query_item = execute(update_item, {"target_item_id": item_id,
+                                              "item_name": item_name,
+                                              "item_description": item_description}).first()
+            # Saving the changes to the database.
+            db.session.commit()
         # Create a dictionary structure to include it in response with updated values.
-        result = {
-            "id": query_item.id,
-            "item_id": query_item.item_id,
-            "item_name": query_item.item_name,
-            "item_description": query_item.item_description
-        }
+        result = row_to_dict(query_item)
         # Return the response with status and result.
-        return jsonify({"status": "sucesss", "result": result})
+        return render({"status": "sucesss", "result": result})
 
     def post(self):
         """
         Creates an item.
         """
         # Retrieve the payload
-        item_id = request.json.get('item_id')
-        item_name = request.json.get('item_name')
-        item_description = request.json.get('item_description')
+        payload = read_body()
+        item_id = payload.get('item_id')
+        item_name = payload.get('item_name')
+        item_description = payload.get('item_description')
         # Add the new Item model object and commit.
         db.session.add(Item(item_id=item_id,
                             item_name=item_name,
                             item_description=item_description))
         db.session.commit()
         # Return the response with status and result.
-        return jsonify({"status": "sucesss"})
+        return render({"status": "sucesss"})
 
     def delete(self, item_id):
-        # Queries the Item table and filter by item_id provided from the API.
-        query_item = Item.query.filter(Item.item_id == item_id).first()
-        # Check whether query_item is not None (meaning the record exists in Item table), then delete and commit.
-        if query_item:
-            db.session.delete(query_item)
+        # Runs the precompiled delete for the item_id provided from the API, then commit.
+        execute(delete_item, {"item_id": item_id})
         db.session.commit()
         # Return the response with status and result.
-        return jsonify({"status": "sucesss"})
+        return render({"status": "sucesss"})
+
+
+class ItemListAPI(Resource):
+    method_decorators = [track_access, profile_request]
+
+    def get(self):
+        """
+        Retrieves a page of items, or a batch of items when item_id is given one or more times.
+        """
+        item_ids = request.args.getlist('item_id')
+        if item_ids:
+            # Runs the precompiled batch select for all the requested item_ids.
+            records = fetch_records(select_item_batch, {"item_ids": item_ids})
+        else:
+            # Runs the precompiled page select, pages are numbered from 1.
+            page = max(request.args.get('page', 1, type=int), 1)
+            per_page = min(max(request.args.get('per_page', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+            records = fetch_records(select_item_page, {"limit": per_page, "offset": (page - 1) * per_page})
+        # Create a list of dictionary structures to include it in response, or one list per field if asked.
+        if wants_columnar():
+            result = columnar(records, item_fields)
+        else:
+            result = [row_to_dict(record) for record in records]
+        # Return the response with status and result.
+        return render({"status": "sucesss", "result": result})
+
+
+class ItemExportAPI(Resource):
+    def get(self):
+        """
+        Streams every item without holding the whole table in memory, one item at a time, or with layout=columnar
+        one batch of columns at a time.
+        """
+        records = stream_records(EXPORT_BATCH_SIZE)
+        if wants_columnar():
+            # Takes the records a batch at a time and lays each batch out as one list per field.
+            batches = iter(lambda: list(islice(records, EXPORT_BATCH_SIZE)), [])
+            return render_stream(columnar(batch, item_fields) for batch in batches)
+        return render_stream(row_to_dict(record) for record in records)
@@ -0,0 +1,87 @@
+# app/api/job_api.py
+import os
+
+from flask import request, send_file
+from flask_restful import Resource, abort
+from app.jobs import JOB_KINDS, job_runner
+from app.models.job_model import Job, SUCCEEDED
+
+
+def job_to_dict(job):
+    """
+    Create a dictionary structure of the job to include in responses.
+    """
+    return {
+        "job_id": job.job_id,
+        "kind": job.kind,
+        "status": job.status,
+        "processed": job.processed,
+        "total": job.total,
+        "result": job.result,
+        "error": job.error
+    }
+
+
+def check_params(kind, params):
+    """
+    Aborts with a bad request unless the params hold what a job of the kind needs.
+    """
+    if not isinstance(params, dict):
+        abort(400, message='Job params must be an object.')
+    if kind == 'import':
+        items = params.get('items')
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            abort(400, message='Import job params must have items, a list of objects.')
+    elif kind == 'delete':
+        item_ids = params.get('item_ids')
+        if not isinstance(item_ids, list) or not all(isinstance(item_id, str) for item_id in item_ids):
+            abort(400, message='Delete job params must have item_ids, a list of strings.')
+
+
+def get_job_or_404(job_id):
+    job = Job.query.filter(Job.job_id == job_id).first()
+    if job is None:
+        abort(404, message='No job {} exists.'.format(job_id))
+    return job
+
+
+class JobAPI(Resource):
+    def get(self, job_id):
+        """
+        Retrieves the status and progress of a job.
+        """
+        job = get_job_or_404(job_id)
+        return {"status": "success", "result": job_to_dict(job)}
+
+    def post(self):
+        """
+        Submits a job, which runs in the background.
+        """
+        payload = request.get_json(silent=True) or {}
+        kind = payload.get('kind')
+        params = payload.get('params', {})
+        if kind not in JOB_KINDS:
+            abort(400, message='Job kind must be one of {}.'.format(', '.join(sorted(JOB_KINDS))))
+        check_params(kind, params)
+        job = job_runner.submit(kind, params)
+        return {"status": "success", "result": job_to_dict(job)}, 202
+
+    def delete(self, job_id):
+        """
+        Cancels a job, which stops after its current batch.
+        """
+        job = get_job_or_404(job_id)
+        if not job_runner.cancel(job):
+            abort(409, message='Job {} has already finished.'.format(job_id))
+        return {"status": "success", "result": job_to_dict(get_job_or_404(job_id))}, 202
+
+
+class JobOutputAPI(Resource):
+    def get(self, job_id):
+        """
+        Downloads the output of a finished export job.
+        """
+        job = get_job_or_404(job_id)
+        if job.status != SUCCEEDED or not job.result or not os.path.exists(job.result['path']):
+            abort(404, message='Job {} has no output.'.format(job_id))
+        return send_file(job.result['path'], mimetype='application/jsonl')
@@ -0,0 +1,92 @@
+# app/api/serialization.py
+"""
+Content negotiation for item payloads.
+
+JSON is always available and stays the default. MessagePack is offered when the
+msgpack package is installed, for clients that send it in Accept (responses) or
+Content-Type (request bodies). List responses can also be laid out as columns,
+one array per field, instead of one object per item.
+"""
+import json
+
+from flask import Response, jsonify, request, stream_with_context
+from werkzeug.exceptions import UnsupportedMediaType
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+JSON_LINES_MIMETYPE = 'application/jsonl'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+
+# Response types in order of preference, JSON first so it wins for */* and missing Accept headers.
+RESPONSE_MIMETYPES = (JSON_MIMETYPE,) + (MSGPACK_MIMETYPES if msgpack else ())
+
+
+def columnar(records, fields):
+    """
+    Lay out a list of records, tuples of values in fields order, as one list of values per field.
+    """
+    columns = list(zip(*records)) or [()] * len(fields)
+    return {field: list(column) for field, column in zip(fields, columns)}
+
+
+def wants_columnar():
+    """
+    Whether the client asked for the columnar layout of a list response.
+    """
+    return request.args.get('layout') == 'columnar'
+
+
+def read_body(form=False):
+    """
+    Reads the request body, as MessagePack when the client sent it, otherwise as
+    the form or JSON body the endpoint has always accepted.
+    """
+    if request.mimetype in MSGPACK_MIMETYPES:
+        if msgpack is None:
+            raise UnsupportedMediaType('MessagePack support is not installed.')
+        return msgpack.unpackb(request.get_data())
+    if form:
+        return request.form
+    return request.json
+
+
+def negotiate():
+    """
+    The best response type the client accepts.
+    """
+    return request.accept_mimetypes.best_match(RESPONSE_MIMETYPES, default=JSON_MIMETYPE)
+
+
+def render(payload):
+    """
+    Encode the response payload in the best type the client accepts.
+    """
+    mimetype = negotiate()
+    if mimetype == JSON_MIMETYPE:
+        response = jsonify(payload)
+    else:
+        response = Response(msgpack.packb(payload), mimetype=mimetype)
+    # The body depends on the Accept header, so caches must key on it.
+    response.vary.add('Accept')
+    return response
+
+
+def render_stream(objects):
+    """
+    Stream a sequence of objects in the best type the client accepts, as JSON lines or as back-to-back MessagePack
+    objects which msgpack.Unpacker reads one at a time.
+    """
+    mimetype = negotiate()
+    if mimetype == JSON_MIMETYPE:
+        mimetype = JSON_LINES_MIMETYPE
+        encoded = (json.dumps(obj) + '\n' for obj in objects)
+    else:
+        encoded = (msgpack.packb(obj) for obj in objects)
+    # The session the objects are read through stays open until the last one is sent.
+    response = Response(stream_with_context(encoded), mimetype=mimetype)
+    response.vary.add('Accept')
+    return response
@@ -0,0 +1,178 @@
+# app/coalescer.py
+"""
+Write coalescing for item updates.
+
+When enabled, item updates are queued instead of committed one by one. A
+flusher thread collects the updates arriving within a short window, keeps only
+the last update for each item_id, and writes them all in one transaction, so a
+burst of updates costs a single commit. Each caller blocks until the commit
+holding its update is durable, then gets the item as committed.
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+from app import db
+from app.config import WRITE_COALESCE_TIMEOUT_SECONDS
+from app.models.item_queries import ItemRecord, update_item, execute
+
+
+class PendingUpdate:
+    """
+    The latest values queued for one item_id, and every caller waiting on them.
+    """
+    __slots__ = ('item_name', 'item_description', 'waiters')
+
+    def __init__(self):
+        self.waiters = []
+
+
+class WriteCoalescer:
+    """
+    Coalesces item updates into group commits, initialised with the Flask app like the db extension.
+    """
+
+    def __init__(self, app=None, window_ms=0, timeout=WRITE_COALESCE_TIMEOUT_SECONDS):
+        self.app = None
+        self.window = 0
+        self.timeout = timeout
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._metrics_lock = threading.Lock()
+        self.reset_metrics()
+        if app is not None:
+            self.init_app(app, window_ms)
+
+    @property
+    def enabled(self):
+        return self.window > 0
+
+    def init_app(self, app, window_ms):
+        self.app = app
+        self.window = window_ms / 1000
+        if self.enabled:
+            threading.Thread(target=self._flush_forever, name='write-coalescer', daemon=True).start()
+
+    def reset_metrics(self):
+        with self._metrics_lock:
+            self.submitted = 0
+            self.coalesced = 0
+            self.written = 0
+            self.missing = 0
+            self.failed = 0
+            self.commits = 0
+
+    def metrics(self):
+        """
+        The coalescing counters, suitable for including in a JSON response.
+
+        Submitted updates end up written, missing (no item has the item_id) or failed, and are counted once each
+        whether or not they were coalesced with others.
+        """
+        with self._metrics_lock:
+            return {
+                "enabled": self.enabled,
+                "window_ms": self.window * 1000,
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "written": self.written,
+                "missing": self.missing,
+                "failed": self.failed,
+                "commits": self.commits,
+                # Only committed updates count, those of a flush whose whole transaction failed took no commit.
+                "updates_per_commit": (self.written + self.missing) / self.commits if self.commits else 0.0
+            }
+
+    def update(self, item_id, item_name, item_description):
+        """
+        Queues an item update and waits for it to be committed.
+
+        Returns the committed item as an ItemRecord, or None if no item has the item_id. Raises the database error
+        if the update failed, or TimeoutError if no commit came within the timeout, in which case the update may
+        still be committed later.
+        """
+        future = Future()
+        with self._condition:
+            pending = self._pending.get(item_id)
+            if pending is None:
+                pending = self._pending[item_id] = PendingUpdate()
+            else:
+                # A later update to the same item replaces the queued one, last writer wins.
+                with self._metrics_lock:
+                    self.coalesced += 1
+            pending.item_name = item_name
+            pending.item_description = item_description
+            pending.waiters.append(future)
+            self._condition.notify()
+        with self._metrics_lock:
+            self.submitted += 1
+        return future.result(timeout=self.timeout)
+
+    def _flush_forever(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+            # Let the window fill up, then take everything queued so far.
+            time.sleep(self.window)
+            with self._condition:
+                batch, self._pending = self._pending, {}
+            # Nothing may stop the flusher, it is the only thread that answers the waiting callers.
+            try:
+                self._resolve(batch, self._write(batch))
+            except Exception as e:
+                self.app.logger.exception('Write coalescing flush failed')
+                self._resolve(batch, dict.fromkeys(batch, e))
+
+    def _write(self, batch):
+        """
+        Writes the batch in one transaction, returning the result for each item_id.
+        """
+        results = {}
+        with self.app.app_context():
+            try:
+                for item_id, pending in batch.items():
+                    # A savepoint per item keeps one bad update from failing the others.
+                    try:
+                        with db.session.begin_nested():
+                            row = execute(update_item, {"target_item_id": item_id,
+                                                        "item_name": pending.item_name,
+                                                        "item_description": pending.item_description}).first()
+                        results[item_id] = ItemRecord._make(row) if row else None
+                    except Exception as e:
+                        results[item_id] = e
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                results = dict.fromkeys(batch, e)
+            else:
+                with self._metrics_lock:
+                    self.commits += 1
+            finally:
+                db.session.remove()
+        return results
+
+    def _resolve(self, batch, results):
+        """
+        Answers every caller waiting on the batch with the result for its item_id.
+        """
+        for item_id, pending in batch.items():
+            result = results[item_id]
+            failed = isinstance(result, Exception)
+            with self._metrics_lock:
+                if failed:
+                    self.failed += len(pending.waiters)
+                elif result is None:
+                    self.missing += len(pending.waiters)
+                else:
+                    self.written += len(pending.waiters)
+            for waiter in pending.waiters:
+                if waiter.done():
+                    continue
+                if failed:
+                    waiter.set_exception(result)
+                else:
+                    waiter.set_result(result)
+
+
+write_coalescer = WriteCoalescer()
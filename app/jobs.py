@@ -0,0 +1,270 @@
+# app/jobs.py
+"""
+Background jobs for bulk operations which are too long for a request handler.
+
+Jobs are rows in the job table and run on a bounded thread pool. Each job kind
+is a step function which handles one batch and records a checkpoint on the
+job; the batch and the checkpoint are committed together, so a job resumed
+after a restart continues from the last committed batch without repeating or
+skipping work. Jobs are cancelled by setting their status to cancelling, which
+the runner checks between batches.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_, select, text
+
+from app import db
+from app.config import JOB_BATCH_SIZE, JOB_LEASE_SECONDS, JOB_OUTPUT_DIR, JOB_WORKERS
+from app.models.item_queries import (delete_item_batch, insert_item, item_table, select_item_after,
+                                     execute, fetch_records, row_to_dict)
+from app.models.job_model import Job, ACTIVE_STATES, QUEUED, RUNNING, CANCELLING, CANCELLED, SUCCEEDED, FAILED
+
+
+def import_items(job, params):
+    """
+    Inserts the items in params["items"], one batch per step.
+    """
+    items = params['items']
+    offset = (job.checkpoint or {}).get('offset', 0)
+    batch = items[offset:offset + JOB_BATCH_SIZE]
+    if batch:
+        execute(insert_item, [{"item_id": item.get('item_id'),
+                               "item_name": item.get('item_name'),
+                               "item_description": item.get('item_description')} for item in batch])
+    job.checkpoint = {"offset": offset + len(batch)}
+    job.processed = offset + len(batch)
+    job.total = len(items)
+    return job.processed >= job.total
+
+
+def delete_items(job, params):
+    """
+    Deletes the items in params["item_ids"], one batch per step.
+    """
+    item_ids = params['item_ids']
+    offset = (job.checkpoint or {}).get('offset', 0)
+    batch = item_ids[offset:offset + JOB_BATCH_SIZE]
+    if batch:
+        execute(delete_item_batch, {"item_ids": batch})
+    job.checkpoint = {"offset": offset + len(batch)}
+    job.processed = offset + len(batch)
+    job.total = len(item_ids)
+    return job.processed >= job.total
+
+
+def export_items(job, params):
+    """
+    Writes every item to a JSON lines file, one batch per step.
+
+    The file is synced before the checkpoint is committed, and cut back to the
+    checkpointed size when a step starts, so a resumed export never holds
+    duplicated or partial lines.
+    """
+    checkpoint = job.checkpoint or {"after_id": 0, "size": 0}
+    if job.total is None:
+        job.total = db.session.execute(select(func.count()).select_from(item_table)).scalar()
+    records = fetch_records(select_item_after, {"after_id": checkpoint['after_id'], "limit": JOB_BATCH_SIZE})
+
+    os.makedirs(JOB_OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(JOB_OUTPUT_DIR, '{}.jsonl'.format(job.job_id))
+    with open(path, 'ab') as output:
+        output.truncate(checkpoint['size'])
+        for record in records:
+            output.write(json.dumps(row_to_dict(record)).encode('utf-8') + b'\n')
+        output.flush()
+        os.fsync(output.fileno())
+        size = output.tell()
+
+    job.checkpoint = {"after_id": records[-1].id if records else checkpoint['after_id'], "size": size}
+    job.processed += len(records)
+    job.result = {"path": path, "size": size}
+    return len(records) < JOB_BATCH_SIZE
+
+
+def reindex_items(job, params):
+    """
+    Rebuilds the indexes of the item table in a single step.
+
+    On PostgreSQL the rebuild runs concurrently, outside any transaction, so item reads and writes carry on
+    while it runs.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        # REINDEX CONCURRENTLY cannot run inside a transaction block.
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text('REINDEX TABLE CONCURRENTLY item'))
+    else:
+        db.session.execute(text('REINDEX item'))
+    job.processed = job.total = 1
+    return True
+
+
+# The step function for each job kind. Each call is given the job and its params, handles one batch and returns
+# True once the job is done.
+JOB_KINDS = {
+    'import': import_items,
+    'delete': delete_items,
+    'export': export_items,
+    'reindex': reindex_items,
+}
+
+
+class JobRunner:
+    """
+    Runs jobs on a bounded thread pool, initialised with the Flask app like the db extension.
+
+    Any number of runners, one per service process, can share the job table. A runner only takes a job by moving
+    it from queued to running in a single conditional update, so each job runs in exactly one place. While it runs
+    a job the runner renews its lease with a heartbeat. When a runner stops, its jobs go back to queued once the
+    lease has expired, and are taken over by the next runner to look for work.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.executor = None
+        self.runner_id = uuid.uuid4().hex
+        # Jobs handed to this runner's pool and not yet finished with.
+        self._local_jobs = set()
+        self._local_jobs_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='job')
+
+    def submit(self, kind, params):
+        """
+        Records a new job and queues it, returning the job.
+        """
+        job = Job(job_id=uuid.uuid4().hex, kind=kind, params=params)
+        db.session.add(job)
+        db.session.commit()
+        self._queue(job.job_id)
+        return job
+
+    def cancel(self, job):
+        """
+        Asks an active job to stop after its current batch. Returns False if the job has already finished.
+        """
+        cancelled = Job.query.filter(Job.job_id == job.job_id, Job.status.in_(ACTIVE_STATES)) \
+            .update({Job.status: CANCELLING}, synchronize_session=False)
+        db.session.commit()
+        return bool(cancelled)
+
+    def resume(self):
+        """
+        Queues the jobs left unfinished by stopped runners, then keeps renewing this runner's leases and looking for
+        abandoned jobs in the background. Must be called in an app context.
+        """
+        self._recover()
+        threading.Thread(target=self._maintain_forever, name='job-lease', daemon=True).start()
+
+    def _queue(self, job_id):
+        with self._local_jobs_lock:
+            if job_id in self._local_jobs:
+                return
+            self._local_jobs.add(job_id)
+        self.executor.submit(self._run, job_id)
+
+    def _recover(self):
+        """
+        Returns running jobs with an expired lease to queued, and queues every queued job this runner has not.
+        """
+        stale = datetime.utcnow() - timedelta(seconds=JOB_LEASE_SECONDS)
+        expired = or_(Job.heartbeat.is_(None), Job.heartbeat < stale)
+        Job.query.filter(Job.status == RUNNING, expired) \
+            .update({Job.status: QUEUED, Job.owner: None}, synchronize_session=False)
+        Job.query.filter(Job.status == CANCELLING, expired) \
+            .update({Job.status: CANCELLED, Job.owner: None}, synchronize_session=False)
+        db.session.commit()
+        for job in Job.query.filter(Job.status == QUEUED).order_by(Job.id):
+            self._queue(job.job_id)
+
+    def _maintain_forever(self):
+        # Heartbeats come often enough that a lease only expires when its runner has really stopped.
+        while True:
+            time.sleep(JOB_LEASE_SECONDS / 3)
+            with self.app.app_context():
+                try:
+                    # Only jobs with a step still running here are renewed, a job this runner has given up on
+                    # must let its lease expire so another runner takes it over.
+                    with self._local_jobs_lock:
+                        local_jobs = list(self._local_jobs)
+                    if local_jobs:
+                        Job.query.filter(Job.job_id.in_(local_jobs), Job.owner == self.runner_id,
+                                         Job.status.in_((RUNNING, CANCELLING))) \
+                            .update({Job.heartbeat: datetime.utcnow()}, synchronize_session=False)
+                        db.session.commit()
+                    self._recover()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('Failed to renew job leases')
+                finally:
+                    db.session.remove()
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            try:
+                self._run_steps(job_id)
+            except Exception:
+                # Nothing waits on the pool's futures, so the error would be lost. The job's lease expires and
+                # another runner takes it over.
+                db.session.rollback()
+                self.app.logger.exception('Failed to record the outcome of job %s', job_id)
+            finally:
+                db.session.remove()
+                with self._local_jobs_lock:
+                    self._local_jobs.discard(job_id)
+
+    def _run_steps(self, job_id):
+        # Take the job, unless another runner has it or it was cancelled while queued.
+        claimed = Job.query.filter(Job.job_id == job_id, Job.status == QUEUED) \
+            .update({Job.status: RUNNING, Job.owner: self.runner_id, Job.heartbeat: datetime.utcnow()},
+                    synchronize_session=False)
+        if not claimed:
+            Job.query.filter(Job.job_id == job_id, Job.status == CANCELLING, Job.owner.is_(None)) \
+                .update({Job.status: CANCELLED}, synchronize_session=False)
+            db.session.commit()
+            return
+        db.session.commit()
+
+        job = Job.query.filter(Job.job_id == job_id).first()
+        step = JOB_KINDS[job.kind]
+        try:
+            # Read once, the params are not reloaded with the job after each commit.
+            params = job.params
+            done = False
+            while not done:
+                if job.owner != self.runner_id:
+                    # The lease expired and another runner has taken the job over.
+                    return
+                done = step(job, params)
+                # Commit the batch with its checkpoint, which also reloads the status and owner.
+                db.session.commit()
+                if job.status == CANCELLING:
+                    job.status = CANCELLED
+                    job.owner = None
+                    db.session.commit()
+                    return
+            # Only a job still running succeeds, a cancel which arrived after the last batch leaves it cancelled.
+            finished = Job.query.filter(Job.job_id == job_id, Job.status == RUNNING) \
+                .update({Job.status: SUCCEEDED, Job.owner: None}, synchronize_session=False)
+            if not finished:
+                Job.query.filter(Job.job_id == job_id, Job.status == CANCELLING) \
+                    .update({Job.status: CANCELLED, Job.owner: None}, synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            # Only while this runner still holds the job, one which lost its lease must not fail another's run.
+            Job.query.filter(Job.job_id == job_id, Job.owner == self.runner_id) \
+                .update({Job.status: FAILED, Job.owner: None, Job.error: str(e)}, synchronize_session=False)
+            db.session.commit()
+
+
+job_runner = JobRunner()
@@ -1,24 +1,65 @@
-import os
+import threading
 
 from flask import Flask
 from flask_restful import Api
+from werkzeug.serving import is_running_from_reloader
 
 from app import db
-from app.api.item_api import ItemAPI
-from app.config import DB_CONN_STR, API_PORT
+from app.analytics import access_stats, warm_up
+from app.api.admin_api import (SamplingProfileAPI, RequestProfileAPI, StatementCacheAPI, WriteCoalescingAPI,
+                               AccessStatsAPI)
+from app.api.item_api import ItemAPI, ItemListAPI, ItemExportAPI
+from app.api.job_api import JobAPI, JobOutputAPI
+from app.coalescer import write_coalescer
+from app.config import DB_CONN_STR, API_PORT, DB_PREPARE_THRESHOLD, WRITE_COALESCE_WINDOW_MS, ACCESS_TRACKING
+from app.jobs import job_runner
 
-# Quick and dirty main script to launch the API
-if __name__ == '__main__':
+
+def create_app(conn_str=DB_CONN_STR, resume_jobs=True, warm_cache=True, save_stats=True):
+    """
+    Builds the Flask app, registers the API resources and creates the tables. Then resumes unfinished jobs, warms
+    the database cache with the hottest items from the last run, and starts saving the hottest items of this run,
+    unless told not to.
+    """
     flask_app = Flask('item_service')
     api = Api(flask_app)
     api.add_resource(ItemAPI, '/item', '/item/<string:item_id>')
+    api.add_resource(ItemListAPI, '/items')
+    api.add_resource(ItemExportAPI, '/items/export')
+    api.add_resource(JobAPI, '/jobs', '/jobs/<string:job_id>')
+    api.add_resource(JobOutputAPI, '/jobs/<string:job_id>/output')
+    api.add_resource(SamplingProfileAPI, '/admin/profile')
+    api.add_resource(RequestProfileAPI, '/admin/profiles/<string:profile_id>')
+    api.add_resource(StatementCacheAPI, '/admin/statement-cache')
+    api.add_resource(WriteCoalescingAPI, '/admin/write-coalescing')
+    api.add_resource(AccessStatsAPI, '/admin/access-stats')
 
-    flask_app.config['SQLALCHEMY_DATABASE_URI'] = DB_CONN_STR
+    flask_app.config['SQLALCHEMY_DATABASE_URI'] = conn_str
+    # psycopg (v3) prepares repeated statements server side, which the precompiled item queries always are.
+    if conn_str.startswith('postgresql+psycopg:'):
+        flask_app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'connect_args': {'prepare_threshold': DB_PREPARE_THRESHOLD}
+        }
 
     db.init_app(flask_app)
+    job_runner.init_app(flask_app)
+    write_coalescer.init_app(flask_app, WRITE_COALESCE_WINDOW_MS)
 
     with flask_app.app_context():
         db.create_all()
         db.session.commit()
+        if resume_jobs:
+            job_runner.resume()
+        if warm_cache:
+            warm_up(flask_app)
+    if save_stats and ACCESS_TRACKING:
+        threading.Thread(target=access_stats.save_forever, args=(flask_app,), name='access-stats', daemon=True).start()
+
+    return flask_app
 
-    flask_app.run(debug=True, port=API_PORT)
+
+# Quick and dirty main script to launch the API
+if __name__ == '__main__':
+    # The debug reloader runs this script twice, only the child process serving requests should run jobs.
+    serving = is_running_from_reloader()
+    create_app(resume_jobs=serving, warm_cache=serving, save_stats=serving).run(debug=True, port=API_PORT)
@@ -0,0 +1,157 @@
+# app/models/item_queries.py
+"""
+Precompiled Core statements for the hot item queries.
+
+The statements are built once at import time with bound parameters, so every
+request reuses the same statement object instead of rebuilding an ORM query.
+SQLAlchemy keys its compiled cache on the statement structure, so these always
+hit after the first execution, and the SQL text sent to the driver is identical
+between calls, which lets the Postgres driver use a server-side prepared
+statement for it (see DB_PREPARE_THRESHOLD in app/config.py).
+
+Reads return the selected columns as ItemRecord tuples rather than ORM Item
+instances, which skips the identity map and attribute instrumentation.
+"""
+import threading
+from collections import namedtuple
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.util import LRUCache
+
+from app import db
+from app.models.item_model import Item
+
+
+class StatementCache(LRUCache):
+    """
+    SQLAlchemy compiled-statement cache which keeps hit and miss counts.
+    """
+
+    def __init__(self, capacity=100):
+        super().__init__(capacity)
+        self.hits = 0
+        self.misses = 0
+        # The cache is shared by every request thread, so the counters are updated under a lock.
+        self._stats_lock = threading.Lock()
+
+    def get(self, key, default=None):
+        compiled = super().get(key, default)
+        with self._stats_lock:
+            if compiled is default:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return compiled
+
+    def stats(self):
+        """
+        The cache counters, suitable for including in a JSON response.
+        """
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "size": len(self),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
+
+
+statement_cache = StatementCache()
+
+item_table = Item.__table__
+
+# The columns returned to API clients.
+item_columns = (item_table.c.id,
+                item_table.c.item_id,
+                item_table.c.item_name,
+                item_table.c.item_description)
+item_fields = tuple(column.name for column in item_columns)
+
+# Lightweight read-only item, holding the API columns in item_fields order.
+ItemRecord = namedtuple('ItemRecord', item_fields)
+
+select_item = (
+    select(*item_columns)
+    .where(item_table.c.item_id == bindparam('item_id'))
+)
+
+update_item = (
+    update(item_table)
+    .where(item_table.c.item_id == bindparam('target_item_id'))
+    .values(item_name=bindparam('item_name'),
+            item_description=bindparam('item_description'))
+    .returning(*item_columns)
+)
+
+delete_item = (
+    delete(item_table)
+    .where(item_table.c.item_id == bindparam('item_id'))
+)
+
+select_item_page = (
+    select(*item_columns)
+    .order_by(item_table.c.id)
+    .limit(bindparam('limit'))
+    .offset(bindparam('offset'))
+)
+
+select_item_batch = (
+    select(*item_columns)
+    .where(item_table.c.item_id.in_(bindparam('item_ids', expanding=True)))
+    .order_by(item_table.c.id)
+)
+
+insert_item = (
+    insert(item_table)
+)
+
+delete_item_batch = (
+    delete(item_table)
+    .where(item_table.c.item_id.in_(bindparam('item_ids', expanding=True)))
+)
+
+select_all_items = (
+    select(*item_columns)
+    .order_by(item_table.c.id)
+)
+
+# Keyset page of items after the given id, for walking the whole table in batches.
+select_item_after = (
+    select(*item_columns)
+    .where(item_table.c.id > bindparam('after_id'))
+    .order_by(item_table.c.id)
+    .limit(bindparam('limit'))
+)
+
+
+def execute(statement, params=None, **execution_options):
+    """
+    Execute one of the item statements in the current session through the shared statement cache.
+    """
+    execution_options["compiled_cache"] = statement_cache
+    return db.session.execute(statement, params, execution_options=execution_options)
+
+
+def fetch_records(statement, params):
+    """
+    Execute one of the item select statements and return its rows as a list of ItemRecord.
+    """
+    return list(map(ItemRecord._make, execute(statement, params)))
+
+
+def stream_records(batch_size=1000):
+    """
+    Yield every item as an ItemRecord in id order, buffering only batch_size rows at a time.
+
+    Uses a server-side cursor on drivers which support one, so memory stays flat however large the table is.
+    """
+    return map(ItemRecord._make, execute(select_all_items, yield_per=batch_size))
+
+
+def row_to_dict(row):
+    """
+    Convert a row or ItemRecord from one of the item statements into the API result structure.
+    """
+    return dict(zip(item_fields, row))
@@ -0,0 +1,43 @@
+# app/models/job_model.py
+from app import db
+
+# Job states. Running jobs whose runner stops renewing its lease go back to queued, to be run again.
+QUEUED = 'queued'
+RUNNING = 'running'
+CANCELLING = 'cancelling'
+CANCELLED = 'cancelled'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class Job(db.Model):
+    __tablename__ = 'job'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True, index=True)
+    job_id = db.Column(db.String(32), nullable=False, index=True, unique=True)
+    kind = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False, index=True, default=QUEUED)
+    # Deferred, as it can hold a whole bulk payload and the runner reads it only once per job.
+    params = db.deferred(db.Column(db.JSON, nullable=False))
+    # Where the job has got to, written in the same transaction as each batch of work.
+    checkpoint = db.Column(db.JSON, nullable=True)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    # The runner holding the job while it runs, and when that runner last renewed its lease on it.
+    owner = db.Column(db.String(32), nullable=True)
+    heartbeat = db.Column(db.DateTime, nullable=True)
+    created_on = db.Column(db.DateTime, server_default=db.func.now())
+    updated_on = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    def __init__(self, **kwargs):
+        self.job_id = kwargs.get('job_id')
+        self.kind = kwargs.get('kind')
+        self.params = kwargs.get('params')
+        self.status = QUEUED
+        self.processed = 0
+
+    def __repr__(self):
+        return "<Job {0} {1} {2}>".format(self.job_id, self.kind, self.status)
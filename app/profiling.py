@@ -0,0 +1,191 @@
+# app/profiling.py
+"""
+On-demand profiling of the running service.
+
+There are two tools here, and neither costs anything while it is not in use:
+
+* SamplingProfiler samples the stacks of every thread in the process for a
+  number of seconds and returns them collapsed, one "frame;frame;frame count"
+  line per stack, which flamegraph.pl and speedscope read directly.
+
+* profile_request is a Resource method decorator which runs a single API call
+  under cProfile, with the time of every SQL statement it executes, when the
+  request carries the X-Profile header. Without the header, or with the admin
+  API disabled, it only checks for it.
+"""
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from functools import wraps
+
+from flask import request
+from sqlalchemy import event
+
+from app import db
+from app.api.auth import check_admin
+from app.config import ADMIN_TOKEN
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+# How many request profiles are kept for retrieval, oldest are discarded first.
+MAX_STORED_PROFILES = 50
+
+# How many lines of the cProfile report are kept per request profile.
+MAX_REPORT_LINES = 60
+
+
+class ProfilerBusy(Exception):
+    """
+    Raised when a sampling profile is requested while another one is running.
+    """
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads in the process at a fixed interval.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    def run(self, seconds):
+        """
+        Samples for the given number of seconds and returns the collapsed stacks as text.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy('A sampling profile is already running.')
+        try:
+            stacks = self._sample(seconds)
+        finally:
+            self._lock.release()
+        return ''.join('{} {}\n'.format(stack, count) for stack, count in stacks.most_common())
+
+    def _sample(self, seconds):
+        own_thread = threading.get_ident()
+        stacks = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_thread:
+                    stacks[collapse(frame)] += 1
+            time.sleep(self.interval)
+        return stacks
+
+
+def collapse(frame):
+    """
+    Render a stack as root-first "file:function:line" frames separated by semicolons.
+    """
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append('{}:{}:{}'.format(code.co_filename, code.co_name, frame.f_lineno))
+        frame = frame.f_back
+    return ';'.join(reversed(frames))
+
+
+sampling_profiler = SamplingProfiler()
+
+# Completed request profiles, keyed by profile id.
+request_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+
+# The SQL timings of the profiled request running on each thread.
+_sql_timings = threading.local()
+_sql_listeners = 0
+_sql_listeners_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_sql_timings, 'queries', None) is not None:
+        _sql_timings.started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = getattr(_sql_timings, 'queries', None)
+    if queries is not None:
+        queries.append({"statement": statement,
+                        "duration_ms": (time.perf_counter() - _sql_timings.started) * 1000})
+
+
+def _listen_sql(engine):
+    """
+    Attach the SQL timing listeners, they stay attached while any profiled request is running.
+    """
+    global _sql_listeners
+    with _sql_listeners_lock:
+        if _sql_listeners == 0:
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        _sql_listeners += 1
+
+
+def _unlisten_sql(engine):
+    global _sql_listeners
+    with _sql_listeners_lock:
+        _sql_listeners -= 1
+        if _sql_listeners == 0:
+            event.remove(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.remove(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _store_profile(profile):
+    profile_id = uuid.uuid4().hex
+    with _profiles_lock:
+        request_profiles[profile_id] = profile
+        while len(request_profiles) > MAX_STORED_PROFILES:
+            request_profiles.popitem(last=False)
+    return profile_id
+
+
+def is_profiling():
+    """
+    Whether the request running on this thread is being profiled.
+    """
+    return getattr(_sql_timings, 'queries', None) is not None
+
+
+def profile_request(fn):
+    """
+    Resource method decorator which profiles the call when the X-Profile header is sent by an admin.
+
+    The profile is stored for retrieval from the admin API, and its id is returned in the X-Profile-Id header.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        # With the admin API disabled the header is ignored, so a stray one never changes the response.
+        if PROFILE_HEADER not in request.headers or not ADMIN_TOKEN:
+            return fn(*args, **kwargs)
+        check_admin()
+
+        engine = db.engine
+        profiler = cProfile.Profile()
+        _sql_timings.queries = []
+        _listen_sql(engine)
+        try:
+            started = time.perf_counter()
+            response = profiler.runcall(fn, *args, **kwargs)
+            duration = time.perf_counter() - started
+        finally:
+            _unlisten_sql(engine)
+            queries, _sql_timings.queries = _sql_timings.queries, None
+
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats()
+        profile_id = _store_profile({
+            "method": request.method,
+            "path": request.path,
+            "duration_ms": duration * 1000,
+            "sql": queries,
+            "report": '\n'.join(report.getvalue().splitlines()[:MAX_REPORT_LINES])
+        })
+        response.headers[PROFILE_ID_HEADER] = profile_id
+        return response
+    return wrapper
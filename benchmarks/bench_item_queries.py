@@ -0,0 +1,71 @@
+"""
+Micro-benchmark comparing the ORM query path with the precompiled item statements.
+
+Runs against an in-memory SQLite database by default, set BENCH_DB_CONN_STR to
+benchmark against PostgreSQL instead (use postgresql+psycopg to include
+server-side prepared statements). Reports CPU time per lookup for each path and
+the statement cache hit rate.
+
+    python -m benchmarks.bench_item_queries
+"""
+import os
+import time
+
+from app import db
+from app.main import create_app
+from app.models.item_model import Item
+from app.models.item_queries import select_item, statement_cache, execute
+
+ITEM_COUNT = 1000
+LOOKUPS = 20000
+
+
+def orm_lookup(item_id):
+    query_item = Item.query.filter(Item.item_id == item_id).first()
+    return query_item.item_name
+
+
+def compiled_lookup(item_id):
+    query_item = execute(select_item, {"item_id": item_id}).first()
+    return query_item.item_name
+
+
+def run(lookup, item_ids):
+    """
+    CPU seconds spent performing every lookup, with the session reset between requests like Flask does.
+    """
+    start = time.process_time()
+    for item_id in item_ids:
+        lookup(item_id)
+        db.session.remove()
+    return time.process_time() - start
+
+
+def main():
+    flask_app = create_app(os.environ.get('BENCH_DB_CONN_STR', 'sqlite://'), resume_jobs=False,
+                           warm_cache=False, save_stats=False)
+    with flask_app.app_context():
+        db.session.query(Item).delete()
+        db.session.add_all(Item(item_id='b{}'.format(i), item_name='name_{}'.format(i),
+                                item_description='desc_{}'.format(i)) for i in range(ITEM_COUNT))
+        db.session.commit()
+
+        item_ids = ['b{}'.format(i % ITEM_COUNT) for i in range(LOOKUPS)]
+        # Warm both paths so one-off compilation is not counted.
+        run(orm_lookup, item_ids[:100])
+        run(compiled_lookup, item_ids[:100])
+
+        orm_time = run(orm_lookup, item_ids)
+        compiled_time = run(compiled_lookup, item_ids)
+
+        print("ORM path:      {:.1f} us/request".format(orm_time / LOOKUPS * 1e6))
+        print("Compiled path: {:.1f} us/request".format(compiled_time / LOOKUPS * 1e6))
+        print("CPU saved:     {:.1f}%".format((1 - compiled_time / orm_time) * 100))
+        print("Statement cache:", statement_cache.stats())
+
+        db.session.query(Item).delete()
+        db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
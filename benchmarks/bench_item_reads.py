@@ -0,0 +1,89 @@
+"""
+Benchmark comparing ORM reads with the ItemRecord read path at 100k rows.
+
+Reads every item and converts it to the API result structure, reporting the
+time taken and the peak memory allocated for the ORM path, the fetched
+ItemRecord list and the streamed ItemRecords. Runs against an in-memory
+SQLite database by default, set BENCH_DB_CONN_STR to benchmark against
+PostgreSQL instead.
+
+    python -m benchmarks.bench_item_reads
+"""
+import os
+import time
+import tracemalloc
+
+from app import db
+from app.main import create_app
+from app.models.item_model import Item
+from app.models.item_queries import (insert_item, select_all_items, execute, fetch_records, stream_records,
+                                     row_to_dict)
+
+ROW_COUNT = 100000
+
+
+def orm_read():
+    count = 0
+    for query_item in Item.query.order_by(Item.id).all():
+        result = {
+            "id": query_item.id,
+            "item_id": query_item.item_id,
+            "item_name": query_item.item_name,
+            "item_description": query_item.item_description
+        }
+        count += 1
+    return count
+
+
+def records_read():
+    count = 0
+    for record in fetch_records(select_all_items, {}):
+        result = row_to_dict(record)
+        count += 1
+    return count
+
+
+def streamed_read():
+    count = 0
+    for record in stream_records():
+        result = row_to_dict(record)
+        count += 1
+    return count
+
+
+def measure(read):
+    """
+    Seconds taken and peak MiB allocated reading every row, starting from an empty session.
+    """
+    db.session.remove()
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = read()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert count == ROW_COUNT
+    return elapsed, peak / 2 ** 20
+
+
+def main():
+    flask_app = create_app(os.environ.get('BENCH_DB_CONN_STR', 'sqlite://'), resume_jobs=False,
+                           warm_cache=False, save_stats=False)
+    with flask_app.app_context():
+        db.session.query(Item).delete()
+        execute(insert_item, [{"item_id": 'b{}'.format(i),
+                               "item_name": 'name_{}'.format(i),
+                               "item_description": 'description of item {}'.format(i)} for i in range(ROW_COUNT)])
+        db.session.commit()
+
+        print("{:<20}{:>10}{:>14}{:>12}".format("path", "seconds", "rows/second", "peak MiB"))
+        for name, read in (("ORM", orm_read), ("ItemRecord", records_read), ("ItemRecord stream", streamed_read)):
+            elapsed, peak = measure(read)
+            print("{:<20}{:>10.2f}{:>14.0f}{:>12.1f}".format(name, elapsed, ROW_COUNT / elapsed, peak))
+
+        db.session.query(Item).delete()
+        db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark comparing jsonify with the MessagePack and columnar encodings of item payloads.
+
+Reports encode time, decode time and payload size at 1, 100 and 10k items.
+
+    python -m benchmarks.bench_serialization
+"""
+import json
+import time
+
+import msgpack
+from flask import Flask, jsonify
+
+from app.api.serialization import columnar
+from app.models.item_queries import ItemRecord, item_fields, row_to_dict
+
+ITEM_COUNTS = (1, 100, 10000)
+
+
+def make_records(count):
+    return [ItemRecord(i, 'b{}'.format(i), 'name_{}'.format(i), 'description of item {}'.format(i))
+            for i in range(count)]
+
+
+def timed(fn, repeat):
+    """
+    Average seconds per call, and the last value returned.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        value = fn()
+    return (time.perf_counter() - start) / repeat, value
+
+
+def main():
+    flask_app = Flask('bench')
+    encodings = {
+        "jsonify": (lambda payload: jsonify(payload).get_data(), json.loads),
+        "msgpack": (msgpack.packb, msgpack.unpackb),
+        "jsonify columnar": (lambda payload: jsonify(payload).get_data(), json.loads),
+        "msgpack columnar": (msgpack.packb, msgpack.unpackb),
+    }
+    with flask_app.app_context():
+        print("{:>6}  {:<18}{:>12}{:>12}{:>12}".format("items", "encoding", "encode us", "decode us", "bytes"))
+        for count in ITEM_COUNTS:
+            records = make_records(count)
+            result = [row_to_dict(record) for record in records]
+            repeat = max(10, 100000 // count)
+            for name, (encode, decode) in encodings.items():
+                data = columnar(records, item_fields) if name.endswith("columnar") else result
+                payload = {"status": "sucesss", "result": data}
+                encode_time, body = timed(lambda: encode(payload), repeat)
+                decode_time, _ = timed(lambda: decode(body), repeat)
+                print("{:>6}  {:<18}{:>12.1f}{:>12.1f}{:>12}".format(
+                    count, name, encode_time * 1e6, decode_time * 1e6, len(body)))
+
+
+if __name__ == '__main__':
+    main()
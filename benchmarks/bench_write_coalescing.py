@@ -0,0 +1,83 @@
+"""
+Benchmark comparing one commit per item update with write coalescing.
+
+Concurrent clients update a small set of hot items, first committing every
+update, then through the write coalescer. Reports throughput and how many
+commits each mode made. Runs against a temporary SQLite file by default, set
+BENCH_DB_CONN_STR to benchmark against PostgreSQL instead.
+
+    python -m benchmarks.bench_write_coalescing
+"""
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import event
+
+from app import db
+from app.coalescer import WriteCoalescer
+from app.main import create_app
+from app.models.item_model import Item
+from app.models.item_queries import update_item, execute
+
+CLIENTS = 16
+UPDATES_PER_CLIENT = 200
+HOT_ITEMS = 10
+WINDOW_MS = 5
+
+
+def direct_update(flask_app, item_id, item_name):
+    with flask_app.app_context():
+        execute(update_item, {"target_item_id": item_id, "item_name": item_name, "item_description": 'desc'})
+        db.session.commit()
+        db.session.remove()
+
+
+def run(update):
+    """
+    Seconds taken for every client to send all its updates.
+    """
+    def client(number):
+        for i in range(UPDATES_PER_CLIENT):
+            update('hot_{}'.format(i % HOT_ITEMS), 'name_{}_{}'.format(number, i))
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(CLIENTS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    flask_app = create_app(os.environ.get('BENCH_DB_CONN_STR', 'sqlite:///' + path), resume_jobs=False,
+                           warm_cache=False, save_stats=False)
+    coalescer = WriteCoalescer(flask_app, window_ms=WINDOW_MS)
+    commits = [0]
+
+    with flask_app.app_context():
+        db.session.query(Item).delete()
+        db.session.add_all(Item(item_id='hot_{}'.format(i), item_name='name', item_description='desc')
+                           for i in range(HOT_ITEMS))
+        db.session.commit()
+        event.listen(db.engine, 'commit', lambda conn: commits.__setitem__(0, commits[0] + 1))
+
+    total = CLIENTS * UPDATES_PER_CLIENT
+    print("{:<12}{:>10}{:>16}{:>10}".format("mode", "seconds", "updates/second", "commits"))
+    for name, update in (("direct", lambda item_id, item_name: direct_update(flask_app, item_id, item_name)),
+                         ("coalesced", lambda item_id, item_name: coalescer.update(item_id, item_name, 'desc'))):
+        commits[0] = 0
+        elapsed = run(update)
+        print("{:<12}{:>10.2f}{:>16.0f}{:>10}".format(name, elapsed, total / elapsed, commits[0]))
+    print("Coalescer:", coalescer.metrics())
+
+    with flask_app.app_context():
+        db.session.query(Item).delete()
+        db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
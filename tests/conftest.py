@@ -2,7 +2,7 @@ import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.config import SERVICE_URL, DB_CONN_STR
+from app.config import SERVICE_URL, DB_CONN_STR, ADMIN_TOKEN
 from tests.db_utils import clear_db
 
 
@@ -14,6 +14,16 @@ def service_url():
     return SERVICE_URL
 
 
+@pytest.fixture(scope="session")
+def admin_headers():
+    """
+    The headers admin requests must send, tests using them are skipped when no admin token is configured
+    """
+    if not ADMIN_TOKEN:
+        pytest.skip("ADMIN_TOKEN is not set")
+    return {'X-Admin-Token': ADMIN_TOKEN}
+
+
 @pytest.fixture(scope="session")
 def db_engine():
     """
@@ -2,8 +2,9 @@
 Basic utils to help tests interacting with the database
 """
 from app.models.item_model import Item
+from app.models.job_model import Job
 
-tables = [Item]
+tables = [Item, Job]
 
 
 def clear_db(session):
@@ -0,0 +1,258 @@
+import pytest
+import requests
+from urllib.parse import urljoin
+
+from app.config import ADMIN_TOKEN
+from app.models.item_model import Item
+
+profile_path = '/admin/profile'
+request_profile_path_tpl = '/admin/profiles/{}'
+
+
+class TestProfileAdminApi:
+    """
+    Test the profiling operations of the admin API
+    """
+
+    def test_sampling_profile_without_token_returns_expected_error(self, service_url, admin_headers):
+        """
+        GET request for a sampling profile without the admin token
+
+        Setup:
+            None
+
+        Expected:
+            Forbidden response
+        """
+        response = requests.get(urljoin(service_url, profile_path), params={'seconds': 0.1})
+        assert response.status_code == 403
+
+    def test_sampling_profile_returns_collapsed_stacks(self, service_url, admin_headers):
+        """
+        GET request for a sampling profile
+
+        Setup:
+            None
+
+        Expected:
+            Success response
+            Collapsed stacks are returned, one "stack count" line each
+        """
+        response = requests.get(urljoin(service_url, profile_path), params={'seconds': 0.2}, headers=admin_headers)
+        assert response.status_code == 200
+        assert response.headers['Content-Type'].startswith('text/plain')
+
+        lines = response.text.splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            assert stack
+            assert int(count) > 0
+
+    def test_profiled_request_stores_expected_profile(self, service_url, db, admin_headers):
+        """
+        GET request for an item with the X-Profile header, then GET request for its profile
+
+        Setup:
+            Specified item is in the DB
+
+        Expected:
+            Success responses
+            The profile holds the report and the SQL executed by the request
+        """
+        db.add(Item(item_id='item_42',
+                    item_name="test_item",
+                    item_description="test_item_desc"))
+        db.commit()
+
+        headers = dict(admin_headers, **{'X-Profile': '1'})
+        response = requests.get(urljoin(service_url, '/item/item_42'), headers=headers)
+        assert response.status_code == 200
+        profile_id = response.headers['X-Profile-Id']
+
+        response = requests.get(urljoin(service_url, request_profile_path_tpl.format(profile_id)),
+                                headers=admin_headers)
+        assert response.status_code == 200
+
+        profile = response.json()['result']
+        assert profile['path'] == '/item/item_42'
+        assert len(profile['sql']) == 1
+        assert 'FROM item' in profile['sql'][0]['statement']
+        assert profile['report']
+
+    def test_profiled_request_without_token_returns_expected_error(self, service_url, db, admin_headers):
+        """
+        GET request for an item with the X-Profile header but no admin token
+
+        Setup:
+            Specified item is in the DB
+
+        Expected:
+            Forbidden response
+        """
+        db.add(Item(item_id='item_42',
+                    item_name="test_item",
+                    item_description="test_item_desc"))
+        db.commit()
+
+        response = requests.get(urljoin(service_url, '/item/item_42'), headers={'X-Profile': '1'})
+        assert response.status_code == 403
+
+    def test_profile_header_with_admin_disabled_is_ignored(self, service_url, db):
+        """
+        GET request for an item with the X-Profile header while the admin API is disabled
+
+        Setup:
+            Specified item is in the DB
+            No admin token is configured
+
+        Expected:
+            Success response with the item, without a profile
+        """
+        if ADMIN_TOKEN:
+            pytest.skip("ADMIN_TOKEN is set")
+        db.add(Item(item_id='item_42',
+                    item_name="test_item",
+                    item_description="test_item_desc"))
+        db.commit()
+
+        response = requests.get(urljoin(service_url, '/item/item_42'), headers={'X-Profile': '1'})
+        assert response.status_code == 200
+        assert response.json()['result']['item_id'] == 'item_42'
+        assert 'X-Profile-Id' not in response.headers
+
+
+class TestStatementCacheAdminApi:
+    """
+    Test the statement cache operations of the admin API
+    """
+
+    def test_stats_count_item_lookups(self, service_url, db, admin_headers):
+        """
+        GET requests for an item, then GET request for the statement cache statistics
+
+        Setup:
+            Specified item is in the DB
+
+        Expected:
+            Success response
+            The item lookups are counted as cache hits
+        """
+        db.add(Item(item_id='item_42',
+                    item_name="test_item",
+                    item_description="test_item_desc"))
+        db.commit()
+
+        stats_path = urljoin(service_url, '/admin/statement-cache')
+        before = requests.get(stats_path, headers=admin_headers).json()['result']
+        for _ in range(5):
+            requests.get(urljoin(service_url, '/item/item_42'))
+
+        response = requests.get(stats_path, headers=admin_headers)
+        assert response.status_code == 200
+
+        stats = response.json()['result']
+        assert stats['hits'] + stats['misses'] - before['hits'] - before['misses'] == 5
+        assert stats['hits'] > before['hits']
+        assert 0 < stats['hit_rate'] <= 1
+
+    def test_stats_without_token_returns_expected_error(self, service_url, admin_headers):
+        """
+        GET request for the statement cache statistics without the admin token
+
+        Setup:
+            None
+
+        Expected:
+            Forbidden response
+        """
+        response = requests.get(urljoin(service_url, '/admin/statement-cache'))
+        assert response.status_code == 403
+
+
+class TestWriteCoalescingAdminApi:
+    """
+    Test the write coalescing operations of the admin API
+    """
+
+    def test_metrics_return_expected_counters(self, service_url, admin_headers):
+        """
+        GET request for the write coalescing counters
+
+        Setup:
+            None
+
+        Expected:
+            Success response
+            Every counter is returned
+        """
+        response = requests.get(urljoin(service_url, '/admin/write-coalescing'), headers=admin_headers)
+        assert response.status_code == 200
+
+        metrics = response.json()['result']
+        for counter in ('enabled', 'window_ms', 'submitted', 'coalesced', 'written', 'failed', 'commits'):
+            assert counter in metrics
+
+    def test_metrics_without_token_returns_expected_error(self, service_url, admin_headers):
+        """
+        GET request for the write coalescing counters without the admin token
+
+        Setup:
+            None
+
+        Expected:
+            Forbidden response
+        """
+        response = requests.get(urljoin(service_url, '/admin/write-coalescing'))
+        assert response.status_code == 403
+
+
+class TestAccessStatsAdminApi:
+    """
+    Test the access statistics operations of the admin API
+    """
+
+    def test_access_stats_return_expected_hot_item(self, service_url, db, admin_headers):
+        """
+        GET requests for one item, then GET request for the access statistics
+
+        Setup:
+            Specified item is in the DB
+
+        Expected:
+            Success response
+            The item is among the hottest items of the endpoint and overall
+            Reads are counted
+        """
+        db.add(Item(item_id='hot_42',
+                    item_name="test_item",
+                    item_description="test_item_desc"))
+        db.commit()
+
+        for _ in range(20):
+            requests.get(urljoin(service_url, '/item/hot_42'))
+
+        response = requests.get(urljoin(service_url, '/admin/access-stats'), headers=admin_headers)
+        assert response.status_code == 200
+
+        stats = response.json()['result']
+        endpoint = stats['endpoints']['GET /item/<string:item_id>']
+        assert endpoint['requests'] >= 20
+        top_counts = {item['item_id']: item['count'] for item in endpoint['top_items']}
+        assert top_counts['hot_42'] >= 20
+        assert 'hot_42' in [item['item_id'] for item in stats['top_items']]
+        assert stats['reads'] >= 20
+        assert stats['distinct_items'] >= 1
+
+    def test_access_stats_without_token_returns_expected_error(self, service_url, admin_headers):
+        """
+        GET request for the access statistics without the admin token
+
+        Setup:
+            None
+
+        Expected:
+            Forbidden response
+        """
+        response = requests.get(urljoin(service_url, '/admin/access-stats'))
+        assert response.status_code == 403
@@ -0,0 +1,223 @@
+import json
+import math
+import os
+import random
+from collections import Counter
+
+from app.analytics import AccessStats, CountMinSketch, EndpointStats, HyperLogLog, TopK
+
+
+def zipf_stream(length, distinct, seed=0):
+    """
+    Helper method for a skewed stream of item_ids, where item_0 is the most frequent, as real access patterns are.
+    """
+    keys = ['item_{}'.format(i) for i in range(distinct)]
+    return random.Random(seed).choices(keys, weights=[1 / (i + 1) for i in range(distinct)], k=length)
+
+
+class TestCountMinSketch:
+    """
+    Test the accuracy of the count-min sketch
+    """
+
+    def test_estimates_never_undercount_and_stay_within_the_error_bound(self):
+        """
+        Estimates after a skewed stream
+
+        Setup:
+            10000 accesses to 2000 distinct items
+
+        Expected:
+            No estimate is below the true count
+            Nearly every estimate is within e / width of the stream length above it
+        """
+        stream = zipf_stream(10000, 2000)
+        sketch = CountMinSketch()
+        for key in stream:
+            sketch.add(key)
+
+        exact = Counter(stream)
+        bound = math.e / 1024 * len(stream)
+        assert all(sketch.estimate(key) >= count for key, count in exact.items())
+        within = sum(sketch.estimate(key) - count <= bound for key, count in exact.items())
+        assert within >= 0.95 * len(exact)
+
+    def test_add_returns_the_estimate(self):
+        """
+        Repeated adds of one key
+
+        Setup:
+            None
+
+        Expected:
+            Each add returns the new estimate of the key
+        """
+        sketch = CountMinSketch()
+
+        assert [sketch.add('item_1') for _ in range(3)] == [1, 2, 3]
+        assert sketch.add('item_1', 5) == sketch.estimate('item_1') == 8
+
+
+class TestHyperLogLog:
+    """
+    Test the accuracy of the HyperLogLog
+    """
+
+    def test_small_cardinality_is_close(self):
+        """
+        Count of a few distinct keys, each added several times
+
+        Setup:
+            100 distinct items
+
+        Expected:
+            The count is within 5% of 100
+        """
+        hll = HyperLogLog()
+        for _ in range(3):
+            for i in range(100):
+                hll.add('item_{}'.format(i))
+
+        assert abs(hll.count() - 100) <= 5
+
+    def test_large_cardinality_is_close(self):
+        """
+        Count of many distinct keys
+
+        Setup:
+            100000 distinct items
+
+        Expected:
+            The count is within 12% (several standard errors) of 100000 at the default precision
+            The count is within 5% of 100000 at a higher precision
+        """
+        default, precise = HyperLogLog(), HyperLogLog(precision=14)
+        for i in range(100000):
+            default.add('item_{}'.format(i))
+            precise.add('item_{}'.format(i))
+
+        assert abs(default.count() - 100000) <= 12000
+        assert abs(precise.count() - 100000) <= 5000
+
+    def test_merge_counts_the_union(self):
+        """
+        Merge of two overlapping HyperLogLogs
+
+        Setup:
+            Items 0 to 1999 in one, items 1000 to 2999 in the other
+
+        Expected:
+            The merged count is within 12% of the 3000 distinct items
+        """
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(2000):
+            first.add('item_{}'.format(i))
+            second.add('item_{}'.format(i + 1000))
+
+        first.merge(second)
+
+        assert abs(first.count() - 3000) <= 360
+
+
+class TestTopK:
+    """
+    Test tracking the keys with the highest counts
+    """
+
+    def test_exact_counts_keep_the_top_keys(self):
+        """
+        Offers of every key's running count in a skewed stream
+
+        Setup:
+            20000 accesses to 1000 distinct items, counted exactly
+
+        Expected:
+            The tracked keys and counts are exactly the top 10
+        """
+        stream = zipf_stream(20000, 1000)
+        top = TopK(10)
+        exact = Counter()
+        for key in stream:
+            exact[key] += 1
+            top.offer(key, exact[key])
+
+        assert top.counts == dict(exact.most_common(10))
+
+    def test_zero_k_tracks_nothing(self):
+        """
+        Offers to a TopK tracking no keys
+
+        Setup:
+            None
+
+        Expected:
+            No keys are tracked, and no error is raised
+        """
+        top = TopK(0)
+        for count, key in enumerate(['item_1', 'item_2', 'item_1'], 1):
+            top.offer(key, count)
+
+        assert top.counts == {}
+
+    def test_sketch_estimates_find_the_hot_keys(self):
+        """
+        Endpoint statistics of a skewed stream
+
+        Setup:
+            10000 accesses to 2000 distinct items
+
+        Expected:
+            The 10 most accessed items are all tracked
+        """
+        stream = zipf_stream(10000, 2000)
+        stats = EndpointStats(write=False, top_k=20)
+        for key in stream:
+            stats.record([key])
+
+        assert {key for key, _ in Counter(stream).most_common(10)} <= set(stats.top.counts)
+
+
+class TestAccessStatsSnapshot:
+    """
+    Test saving the hottest items to the snapshot file
+    """
+
+    def test_save_writes_hottest_items(self, tmp_path):
+        """
+        Save after items were accessed
+
+        Setup:
+            Accesses recorded for two items
+
+        Expected:
+            The snapshot holds the items, hottest first
+            No temporary file is left behind
+        """
+        stats = AccessStats()
+        for item_id in ('item_1', 'item_2', 'item_2'):
+            stats.record('GET /item/<string:item_id>', [item_id], write=False)
+        path = str(tmp_path / 'access.json')
+
+        stats.save(path)
+
+        with open(path) as snapshot:
+            assert json.load(snapshot)['top_items'] == [{'item_id': 'item_2', 'count': 2},
+                                                        {'item_id': 'item_1', 'count': 1}]
+        assert os.listdir(tmp_path) == ['access.json']
+
+    def test_save_without_accesses_keeps_the_snapshot(self, tmp_path):
+        """
+        Save before any item was accessed
+
+        Setup:
+            A snapshot from a previous run
+
+        Expected:
+            The snapshot is not overwritten
+        """
+        path = tmp_path / 'access.json'
+        path.write_text('{"top_items": [{"item_id": "item_1", "count": 1}]}')
+
+        AccessStats().save(str(path))
+
+        assert json.loads(path.read_text())['top_items'] == [{'item_id': 'item_1', 'count': 1}]
@@ -0,0 +1,175 @@
+import threading
+
+import pytest
+
+from app import db
+from app.coalescer import WriteCoalescer
+from app.main import create_app
+from app.models.item_model import Item
+from app.models.item_queries import ItemRecord
+
+# Long enough for every update of a test to arrive in the same window.
+WINDOW_MS = 200
+
+
+@pytest.fixture
+def flask_app(tmp_path):
+    """
+    An app on its own SQLite file, holding the items hot_1 and hot_2
+    """
+    flask_app = create_app('sqlite:///{}'.format(tmp_path / 'items.db'), resume_jobs=False, warm_cache=False,
+                           save_stats=False)
+    with flask_app.app_context():
+        for item_id in ('hot_1', 'hot_2'):
+            db.session.add(Item(item_id=item_id, item_name='test_item', item_description='test_item_desc'))
+        db.session.commit()
+        db.session.remove()
+    yield flask_app
+    with flask_app.app_context():
+        db.engine.dispose()
+
+
+def update_concurrently(coalescer, updates):
+    """
+    Helper method to send each (item_id, item_name) update from its own thread, returning the results in order.
+    """
+    results = [None] * len(updates)
+
+    def caller(index, item_id, item_name):
+        try:
+            results[index] = coalescer.update(item_id, item_name, 'test_item_desc')
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=caller, args=(index,) + update) for index, update in enumerate(updates)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def item_names(flask_app):
+    with flask_app.app_context():
+        names = {item.item_id: item.item_name for item in Item.query.all()}
+        db.session.remove()
+    return names
+
+
+class TestWriteCoalescer:
+    """
+    Test the write coalescer against an app, without the service running
+    """
+
+    def test_concurrent_updates_to_one_item_commit_the_last_once(self, flask_app):
+        """
+        Concurrent updates to the same item within one window
+
+        Setup:
+            Existing item in the DB
+
+        Expected:
+            One commit, with the other updates coalesced into it
+            Every caller gets the committed item
+            The item holds the values of one of the updates
+        """
+        coalescer = WriteCoalescer(flask_app, window_ms=WINDOW_MS)
+
+        results = update_concurrently(coalescer, [('hot_1', 'name_{}'.format(i)) for i in range(5)])
+
+        committed = item_names(flask_app)['hot_1']
+        assert committed in {'name_{}'.format(i) for i in range(5)}
+        assert all(isinstance(result, ItemRecord) for result in results)
+        assert {result.item_name for result in results} == {committed}
+        metrics = coalescer.metrics()
+        assert metrics['submitted'] == 5
+        assert metrics['coalesced'] == 4
+        assert metrics['written'] == 5
+        assert metrics['commits'] == 1
+
+    def test_update_of_missing_item_returns_none(self, flask_app):
+        """
+        Update of an item_id no item has
+
+        Setup:
+            None
+
+        Expected:
+            The caller gets None
+            The update is counted as missing, not written
+        """
+        coalescer = WriteCoalescer(flask_app, window_ms=WINDOW_MS)
+
+        assert coalescer.update('missing', 'test_item', 'test_item_desc') is None
+
+        metrics = coalescer.metrics()
+        assert metrics['missing'] == 1
+        assert metrics['written'] == 0
+
+    def test_failed_update_does_not_fail_the_others(self, flask_app):
+        """
+        A bad update in the same window as a good one
+
+        Setup:
+            Existing items in the DB
+
+        Expected:
+            The bad update's caller gets the database error
+            The good update is committed
+        """
+        coalescer = WriteCoalescer(flask_app, window_ms=WINDOW_MS)
+
+        bad, good = update_concurrently(coalescer, [('hot_1', None), ('hot_2', 'updated_item')])
+
+        assert isinstance(bad, Exception)
+        assert good.item_name == 'updated_item'
+        assert item_names(flask_app) == {'hot_1': 'test_item', 'hot_2': 'updated_item'}
+        metrics = coalescer.metrics()
+        assert metrics['failed'] == 1
+        assert metrics['written'] == 1
+        assert metrics['commits'] == 1
+
+    def test_flusher_survives_a_failed_flush(self, flask_app, monkeypatch):
+        """
+        A flush which raises, followed by another update
+
+        Setup:
+            Existing item in the DB
+
+        Expected:
+            The caller of the failed flush gets its error
+            The next update is still committed
+        """
+        coalescer = WriteCoalescer(flask_app, window_ms=WINDOW_MS)
+        write = coalescer._write
+
+        def fail_once(batch):
+            monkeypatch.setattr(coalescer, '_write', write)
+            raise RuntimeError('flush failed')
+        monkeypatch.setattr(coalescer, '_write', fail_once)
+
+        with pytest.raises(RuntimeError):
+            coalescer.update('hot_1', 'updated_item', 'test_item_desc')
+        assert coalescer.update('hot_1', 'updated_item', 'test_item_desc').item_name == 'updated_item'
+
+        metrics = coalescer.metrics()
+        assert metrics['failed'] == 1
+        assert metrics['written'] == 1
+        assert metrics['commits'] == 1
+        assert metrics['updates_per_commit'] == 1.0
+
+    def test_update_times_out_without_a_commit(self, flask_app):
+        """
+        Update which is never flushed
+
+        Setup:
+            A coalescer whose flusher is not running
+
+        Expected:
+            The caller gets a TimeoutError instead of waiting forever
+        """
+        coalescer = WriteCoalescer(timeout=0.1)
+        coalescer.app = flask_app
+
+        with pytest.raises(TimeoutError):
+            coalescer.update('hot_1', 'updated_item', 'test_item_desc')
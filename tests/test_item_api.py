@@ -1,3 +1,4 @@
+import msgpack
 import requests
 from urllib.parse import urljoin
 
@@ -614,3 +615,104 @@ class TestDeleteItemApi:
         """
         response = requests.delete(urljoin(service_url, api_path_tpl.format('invalid_item')))
         assert response.status_code == 500
+
+
+class TestMsgpackItemApi:
+    """
+    Test MessagePack negotiation on the Item API
+    """
+
+    def test_get_with_msgpack_accept_returns_msgpack(self, service_url, db):
+        """
+        GET request accepting MessagePack
+
+        Setup:
+            Specified item is in the DB
+
+        Expected:
+            Success response
+            Specified item is returned encoded as MessagePack
+        """
+        db.add(Item(item_id='item_42',
+                    item_name="test_item",
+                    item_description="test_item_desc"))
+        db.commit()
+
+        response = requests.get(urljoin(service_url, api_path_tpl.format('item_42')),
+                                headers={'Accept': 'application/msgpack'})
+        assert response.status_code == 200
+        assert response.headers['Content-Type'] == 'application/msgpack'
+
+        result = msgpack.unpackb(response.content)['result']
+        assert result['item_id'] == 'item_42'
+        assert result['item_name'] == 'test_item'
+        assert result['item_description'] == 'test_item_desc'
+
+    def test_get_without_accept_returns_json(self, service_url, db):
+        """
+        GET request with no Accept header
+
+        Setup:
+            Specified item is in the DB
+
+        Expected:
+            Success response
+            Specified item is returned encoded as JSON
+        """
+        db.add(Item(item_id='item_42',
+                    item_name="test_item",
+                    item_description="test_item_desc"))
+        db.commit()
+
+        response = requests.get(urljoin(service_url, api_path_tpl.format('item_42')), headers={'Accept': None})
+        assert response.status_code == 200
+        assert response.headers['Content-Type'] == 'application/json'
+
+    def test_post_with_msgpack_body_creates_expected(self, service_url, db):
+        """
+        POST request with new item encoded as MessagePack
+
+        Setup:
+            None
+
+        Expected:
+            Success response
+            New item is created
+        """
+        item = {
+            'item_id': 'item_24',
+            'item_name': 'test_item',
+            'item_description': 'test_item_desc'
+        }
+        response = requests.post(urljoin(service_url, api_path), data=msgpack.packb(item),
+                                 headers={'Content-Type': 'application/msgpack'})
+        assert response.status_code == 200
+
+        items = db.query(Item).all()
+        assert len(items) == 1
+        validate_db_item(items[0], **item)
+
+    def test_put_with_msgpack_body_performs_expected_action(self, service_url, db):
+        """
+        PUT request with update encoded as MessagePack
+
+        Setup:
+            Existing item in the DB
+
+        Expected:
+            Success response
+            Specified item fields are updated
+        """
+        db.add(Item(item_id='item_42',
+                    item_name='test_item',
+                    item_description='test_item_desc'))
+        db.commit()
+
+        update = {'item_name': 'new_name', 'item_description': 'new_desc'}
+        response = requests.put(urljoin(service_url, api_path_tpl.format('item_42')), data=msgpack.packb(update),
+                                headers={'Content-Type': 'application/msgpack'})
+        assert response.status_code == 200
+
+        items = db.query(Item).all()
+        assert len(items) == 1
+        validate_db_item(items[0], item_id='item_42', **update)
@@ -0,0 +1,188 @@
+import json
+
+import msgpack
+import requests
+from urllib.parse import urljoin
+
+from app.models.item_model import Item
+
+api_path = '/items'
+export_path = '/items/export'
+
+
+def add_items(db, count):
+    """
+    Helper method to add numbered items to the DB.
+    """
+    for i in range(count):
+        db.add(Item(item_id='item_{}'.format(i),
+                    item_name='test_item_{}'.format(i),
+                    item_description='test_item_desc'))
+    db.commit()
+
+
+class TestListItemApi:
+    """
+    Test the list and batch GET operations of the Item API
+    """
+
+    def test_list_with_empty_db_returns_no_items(self, service_url, db):
+        """
+        GET request for the item list
+
+        Setup:
+            No items in the DB
+
+        Expected:
+            Success response
+            No items are returned
+        """
+        response = requests.get(urljoin(service_url, api_path))
+        assert response.status_code == 200
+        assert response.json()['result'] == []
+
+    def test_list_pages_return_expected_items(self, service_url, db):
+        """
+        GET request for each page of the item list
+
+        Setup:
+            Five items in the DB
+
+        Expected:
+            Success response
+            Each page holds the expected items in creation order
+        """
+        add_items(db, 5)
+
+        pages = []
+        for page in (1, 2, 3):
+            response = requests.get(urljoin(service_url, api_path), params={'page': page, 'per_page': 2})
+            assert response.status_code == 200
+            pages.append([item['item_id'] for item in response.json()['result']])
+
+        assert pages == [['item_0', 'item_1'], ['item_2', 'item_3'], ['item_4']]
+
+    def test_batch_returns_expected_items(self, service_url, db):
+        """
+        GET request for a batch of item IDs
+
+        Setup:
+            Five items in the DB
+
+        Expected:
+            Success response
+            Only the requested items that exist are returned
+        """
+        add_items(db, 5)
+
+        response = requests.get(urljoin(service_url, api_path),
+                                params={'item_id': ['item_1', 'item_3', 'invalid_id']})
+        assert response.status_code == 200
+
+        items = response.json()['result']
+        assert [item['item_id'] for item in items] == ['item_1', 'item_3']
+        assert items[0]['item_name'] == 'test_item_1'
+        assert items[0]['item_description'] == 'test_item_desc'
+
+    def test_columnar_layout_returns_expected_columns(self, service_url, db):
+        """
+        GET request for the item list in the columnar layout
+
+        Setup:
+            Three items in the DB
+
+        Expected:
+            Success response
+            Items are returned as one list per field
+        """
+        add_items(db, 3)
+
+        response = requests.get(urljoin(service_url, api_path), params={'layout': 'columnar'})
+        assert response.status_code == 200
+
+        result = response.json()['result']
+        assert result['item_id'] == ['item_0', 'item_1', 'item_2']
+        assert result['item_name'] == ['test_item_0', 'test_item_1', 'test_item_2']
+        assert len(result['id']) == 3
+
+    def test_batch_with_msgpack_accept_returns_msgpack(self, service_url, db):
+        """
+        GET request for a batch of item IDs accepting MessagePack
+
+        Setup:
+            Three items in the DB
+
+        Expected:
+            Success response
+            Requested items are returned encoded as MessagePack
+        """
+        add_items(db, 3)
+
+        response = requests.get(urljoin(service_url, api_path), params={'item_id': ['item_0', 'item_2']},
+                                headers={'Accept': 'application/msgpack'})
+        assert response.status_code == 200
+
+        items = msgpack.unpackb(response.content)['result']
+        assert [item['item_id'] for item in items] == ['item_0', 'item_2']
+
+    def test_export_returns_all_items(self, service_url, db):
+        """
+        GET request for the item export
+
+        Setup:
+            Three items in the DB
+
+        Expected:
+            Success response
+            Every item is returned as one JSON line, in creation order
+        """
+        add_items(db, 3)
+
+        response = requests.get(urljoin(service_url, export_path))
+        assert response.status_code == 200
+
+        items = [json.loads(line) for line in response.text.splitlines()]
+        assert [item['item_id'] for item in items] == ['item_0', 'item_1', 'item_2']
+        assert items[2]['item_name'] == 'test_item_2'
+
+    def test_export_columnar_layout_returns_expected_columns(self, service_url, db):
+        """
+        GET request for the item export in the columnar layout
+
+        Setup:
+            Three items in the DB
+
+        Expected:
+            Success response
+            Items are returned as a batch with one list per field
+        """
+        add_items(db, 3)
+
+        response = requests.get(urljoin(service_url, export_path), params={'layout': 'columnar'})
+        assert response.status_code == 200
+
+        batches = [json.loads(line) for line in response.text.splitlines()]
+        assert len(batches) == 1
+        assert batches[0]['item_id'] == ['item_0', 'item_1', 'item_2']
+        assert batches[0]['item_name'] == ['test_item_0', 'test_item_1', 'test_item_2']
+
+    def test_export_with_msgpack_accept_returns_msgpack(self, service_url, db):
+        """
+        GET request for the item export accepting MessagePack
+
+        Setup:
+            Three items in the DB
+
+        Expected:
+            Success response
+            Every item is returned as one MessagePack object, in creation order
+        """
+        add_items(db, 3)
+
+        response = requests.get(urljoin(service_url, export_path), headers={'Accept': 'application/msgpack'})
+        assert response.status_code == 200
+        assert response.headers['Content-Type'] == 'application/msgpack'
+
+        unpacker = msgpack.Unpacker()
+        unpacker.feed(response.content)
+        assert [item['item_id'] for item in unpacker] == ['item_0', 'item_1', 'item_2']
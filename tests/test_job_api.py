@@ -0,0 +1,194 @@
+import json
+import time
+
+import requests
+from urllib.parse import urljoin
+
+from app.models.item_model import Item
+
+api_path = '/jobs'
+api_path_tpl = api_path + '/{}'
+output_path_tpl = api_path_tpl + '/output'
+
+
+def wait_for_job(service_url, job_id, timeout=10):
+    """
+    Helper method to poll a job until it has finished, returning its final state.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = requests.get(urljoin(service_url, api_path_tpl.format(job_id))).json()['result']
+        if job['status'] not in ('queued', 'running', 'cancelling'):
+            return job
+        time.sleep(0.1)
+    raise AssertionError('Job {} did not finish'.format(job_id))
+
+
+def submit_job(service_url, kind, params=None):
+    """
+    Helper method to submit a job, returning its id.
+    """
+    response = requests.post(urljoin(service_url, api_path), json={'kind': kind, 'params': params or {}})
+    assert response.status_code == 202
+    return response.json()['result']['job_id']
+
+
+class TestJobApi:
+    """
+    Test the operations of the Job API
+    """
+
+    def test_import_job_creates_expected_items(self, service_url, db):
+        """
+        POST request for an import job
+
+        Setup:
+            None
+
+        Expected:
+            Accepted response
+            Job succeeds with every item processed
+            Imported items are in the DB
+        """
+        items = [{'item_id': 'item_{}'.format(i), 'item_name': 'test_item', 'item_description': 'test_item_desc'}
+                 for i in range(5)]
+        job = wait_for_job(service_url, submit_job(service_url, 'import', {'items': items}))
+
+        assert job['status'] == 'succeeded'
+        assert job['processed'] == 5
+        assert job['total'] == 5
+        assert db.query(Item).count() == 5
+
+    def test_delete_job_removes_expected_items(self, service_url, db):
+        """
+        POST request for a bulk delete job
+
+        Setup:
+            Existing items are in the DB
+
+        Expected:
+            Accepted response
+            Job succeeds
+            Only the specified items are removed from the DB
+        """
+        for item_id in ('item_1', 'item_2', 'item_3'):
+            db.add(Item(item_id=item_id, item_name='test_item', item_description='test_item_desc'))
+        db.commit()
+
+        job = wait_for_job(service_url, submit_job(service_url, 'delete', {'item_ids': ['item_1', 'item_3']}))
+
+        assert job['status'] == 'succeeded'
+        assert [item.item_id for item in db.query(Item).all()] == ['item_2']
+
+    def test_export_job_output_returns_expected_items(self, service_url, db):
+        """
+        POST request for an export job, then GET request for its output
+
+        Setup:
+            Existing items are in the DB
+
+        Expected:
+            Job succeeds
+            Output holds one JSON line per item
+        """
+        for item_id in ('item_1', 'item_2'):
+            db.add(Item(item_id=item_id, item_name='test_item', item_description='test_item_desc'))
+        db.commit()
+
+        job_id = submit_job(service_url, 'export')
+        assert wait_for_job(service_url, job_id)['status'] == 'succeeded'
+
+        response = requests.get(urljoin(service_url, output_path_tpl.format(job_id)))
+        assert response.status_code == 200
+        assert [json.loads(line)['item_id'] for line in response.text.splitlines()] == ['item_1', 'item_2']
+
+    def test_failed_job_reports_expected_error(self, service_url, db):
+        """
+        POST request for an import job with an item the DB rejects
+
+        Setup:
+            None
+
+        Expected:
+            Job fails with an error
+        """
+        job = wait_for_job(service_url, submit_job(service_url, 'import', {'items': [{'item_id': 'item_1'}]}))
+
+        assert job['status'] == 'failed'
+        assert job['error']
+
+    def test_cancel_finished_job_returns_expected_error(self, service_url, db):
+        """
+        DELETE request for a finished job
+
+        Setup:
+            Finished reindex job
+
+        Expected:
+            Conflict response
+        """
+        job_id = submit_job(service_url, 'reindex')
+        assert wait_for_job(service_url, job_id)['status'] == 'succeeded'
+
+        response = requests.delete(urljoin(service_url, api_path_tpl.format(job_id)))
+        assert response.status_code == 409
+
+    def test_submit_unknown_kind_returns_expected_error(self, service_url, db):
+        """
+        POST request for a job of an unknown kind
+
+        Setup:
+            None
+
+        Expected:
+            Bad request response
+        """
+        response = requests.post(urljoin(service_url, api_path), json={'kind': 'invalid_kind'})
+        assert response.status_code == 400
+
+    def test_submit_delete_with_string_item_ids_returns_expected_error(self, service_url, db):
+        """
+        POST request for a delete job whose item_ids is a string instead of a list
+
+        Setup:
+            Existing items in the DB, with item_ids matching the characters of the string
+
+        Expected:
+            Bad request response
+            No items are removed from the DB
+        """
+        for item_id in ('1', '2', '3'):
+            db.add(Item(item_id=item_id, item_name='test_item', item_description='test_item_desc'))
+        db.commit()
+
+        response = requests.post(urljoin(service_url, api_path), json={'kind': 'delete',
+                                                                      'params': {'item_ids': '123'}})
+
+        assert response.status_code == 400
+        assert db.query(Item).count() == 3
+
+    def test_submit_import_without_items_returns_expected_error(self, service_url, db):
+        """
+        POST request for an import job without items
+
+        Setup:
+            None
+
+        Expected:
+            Bad request response
+        """
+        response = requests.post(urljoin(service_url, api_path), json={'kind': 'import', 'params': {}})
+        assert response.status_code == 400
+
+    def test_get_unknown_job_returns_expected_error(self, service_url, db):
+        """
+        GET request for a job that does not exist
+
+        Setup:
+            None
+
+        Expected:
+            Not found response
+        """
+        response = requests.get(urljoin(service_url, api_path_tpl.format('invalid_job')))
+        assert response.status_code == 404